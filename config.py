@@ -3,7 +3,7 @@ from pathlib import Path
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True)
 class Config:
     DB_PATH: str = os.getenv('DB_PATH', 'data/high_tech_2024.db')
     DATA_DIR: str = os.getenv('DATA_DIR', 'data')
@@ -12,7 +12,8 @@ class Config:
     FUZZY_THRESHOLD: float = 0.6
     PRODUCT_THRESHOLD: float = 0.5
 
-    def __post_init__(self):
+    def ensure_dirs(self):
+        """Создание рабочих каталогов (вызывается явно, не при импорте)"""
         Path(self.OUTPUT_DIR).mkdir(exist_ok=True)
         Path(self.DATA_DIR).mkdir(exist_ok=True)
 
@@ -1,14 +1,17 @@
 import argparse
 import sys
 from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional
 
 from src.extractor import TradeDataExtractor
 from src.utils.validators import validate_args
 from config import config
 
 
+@lru_cache(maxsize=None)
 def create_parser() -> argparse.ArgumentParser:
-    """Создание парсера аргументов командной строки"""
+    """Создание парсера аргументов командной строки (один раз на процесс)"""
     parser = argparse.ArgumentParser(
         description='Extract trade data from SQLite database',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -20,6 +23,7 @@ Examples:
   python data_extractor.py -p "animals live"     (fuzzy search)
   python data_extractor.py -d 2024-12-01 -c 36 -csv
   python data_extractor.py -d 2024-12-01 -c 36 -p 101
+  python data_extractor.py --create-indexes      (one-off, speeds up filters)
 """
     )
 
@@ -40,6 +44,8 @@ Examples:
                         help=f'Directory with code files (default: {config.DATA_DIR})')
     parser.add_argument('-l', '--limit', type=int, default=config.DEFAULT_LIMIT,
                         help=f'Display record limit (default: {config.DEFAULT_LIMIT})')
+    parser.add_argument('--create-indexes', action='store_true',
+                        help='Create filter indexes in the database file and exit')
 
     # Параметры поиска и списков
     parser.add_argument('--list-countries', action='store_true',
@@ -78,7 +84,8 @@ def handle_list_operations(args, extractor):
         matches = FuzzySearch.search(
             args.search_country.lower(),
             extractor.country_codes,
-            threshold=0.3
+            threshold=0.3,
+            index=extractor.country_index
         )
         display_matches(matches, "countries")
         return True
@@ -89,7 +96,8 @@ def handle_list_operations(args, extractor):
         matches = FuzzySearch.search(
             args.search_product.lower(),
             extractor.hs_codes,
-            threshold=0.3
+            threshold=0.3,
+            index=extractor.hs_index
         )
         display_matches(matches, "products")
         return True
@@ -110,9 +118,37 @@ def display_matches(matches, item_type):
         print(f"No similar {item_type} found")
 
 
-def display_data(df, limit=10):
-    """Отображение данных"""
-    if df is None or df.empty:
+def summarize_frame(df):
+    """Сводная статистика по загруженному DataFrame"""
+    summary = {'records': len(df), 'flows': {}, 'reporters': None,
+               'partners': None, 'value': None, 'qty': None}
+
+    if 'flowtype' in df.columns:
+        summary['flows'] = df['flowtype'].value_counts().to_dict()
+
+    # Уникальные названия - одним вызовом по обоим столбцам
+    name_columns = [col for col in ('reporter_name', 'partner_name') if col in df.columns]
+    if name_columns:
+        unique_counts = df[name_columns].nunique()
+        summary['reporters'] = unique_counts.get('reporter_name')
+        summary['partners'] = unique_counts.get('partner_name')
+
+    # Суммы и число непустых значений (вместо notna().any()) - одним agg
+    numeric_columns = [col for col in ('primaryvalue', 'qty') if col in df.columns]
+    if numeric_columns:
+        totals = df[numeric_columns].agg(['count', 'sum'])
+        for col, key in (('primaryvalue', 'value'), ('qty', 'qty')):
+            if col in totals.columns and totals.at['count', col]:
+                summary[key] = totals.at['sum', col]
+
+    return summary
+
+
+def display_data(df, limit=10, summary=None, show_summary=True):
+    """Отображение данных (summary - статистика по всей выборке, если df усечен)"""
+    # При --limit 0 строк нет, но статистика по выборке выводится
+    has_rows = df is not None and not df.empty
+    if not has_rows and not (summary and summary['records']):
         print("No data to display")
         return
 
@@ -129,7 +165,7 @@ def display_data(df, limit=10):
     # Отображаемые столбцы
     display_columns = ['date', 'flowtype', 'reporter_name', 'partner_name',
                        'cmdCode', 'product_description', 'qty', 'primaryvalue']
-    available_columns = [col for col in display_columns if col in df.columns]
+    available_columns = [col for col in display_columns if has_rows and col in df.columns]
 
     if available_columns:
         # Описания столбцов
@@ -153,48 +189,34 @@ def display_data(df, limit=10):
         # Данные
         print(f"\n{df[available_columns].head(limit)}")
 
-    print(f"\nTotal records: {len(df)}")
-
-    # Сводная статистика
-    if not df.empty:
-        print("\nSUMMARY:")
-        print("-" * 30)
-
-        if 'flowtype' in df.columns:
-            for flow_type, count in df['flowtype'].value_counts().items():
-                print(f"{flow_type}: {count} records")
-
-        if 'reporter_name' in df.columns:
-            print(f"Unique reporter countries: {df['reporter_name'].nunique()}")
+    if not show_summary:
+        return
 
-        if 'partner_name' in df.columns:
-            print(f"Unique partner countries: {df['partner_name'].nunique()}")
+    summary = summary or summarize_frame(df)
+    print(f"\nTotal records: {summary['records']}")
 
-        if 'primaryvalue' in df.columns and df['primaryvalue'].notna().any():
-            print(f"Total trade value: ${df['primaryvalue'].sum():,.2f}")
+    # Сводная статистика
+    print("\nSUMMARY:")
+    print("-" * 30)
 
-        if 'qty' in df.columns and df['qty'].notna().any():
-            print(f"Total quantity: {df['qty'].sum():,.2f}")
+    for flow_type, count in summary['flows'].items():
+        print(f"{flow_type}: {count} records")
 
+    if summary['reporters'] is not None:
+        print(f"Unique reporter countries: {summary['reporters']}")
 
-def main():
-    """Основная функция приложения"""
-    parser = create_parser()
-    args = parser.parse_args()
+    if summary['partners'] is not None:
+        print(f"Unique partner countries: {summary['partners']}")
 
-    # Валидация аргументов
-    is_valid, error_msg = validate_args(args)
-    if not is_valid:
-        print(error_msg)
-        sys.exit(1)
+    if summary['value'] is not None:
+        print(f"Total trade value: ${summary['value']:,.2f}")
 
-    # Создание экстрактора
-    extractor = TradeDataExtractor(args.database, args.data_dir)
+    if summary['qty'] is not None:
+        print(f"Total quantity: {summary['qty']:,.2f}")
 
-    # Обработка операций со списками
-    if handle_list_operations(args, extractor):
-        sys.exit(0)
 
+def run_extraction(args, extractor):
+    """Извлечение, отображение и выгрузка данных по фильтрам"""
     # Вывод информации о фильтрах
     print(f"Extracting data from: {args.database}")
     print("-" * 50)
@@ -212,21 +234,89 @@ def main():
     print()
 
     # Извлечение данных
+    # В память загружаются только отображаемые записи,
+    # статистика по всей выборке считается в SQL
     df = extractor.extract_data(
         date=args.date,
         country=args.country,
-        product=args.product
+        product=args.product,
+        limit=args.limit
     )
 
     if df is not None:
-        display_data(df, limit=args.limit)
-
-        # Сохранение в CSV
-        if args.to_csv and not df.empty:
-            extractor.save_to_csv(df, args.output)
+        summary = extractor.get_summary(
+            date=args.date,
+            country=args.country,
+            product=args.product
+        )
+        # Статистика по усеченной выборке ввела бы в заблуждение
+        failed = summary is None and not df.empty
+        display_data(df, limit=args.limit, summary=summary, show_summary=not failed)
+        if failed:
+            print("\nFailed to compute summary")
+
+        # Наличие записей определяется по всей выборке, а не по усеченному df
+        has_records = summary['records'] > 0 if summary else not df.empty
+
+        # Потоковое сохранение в CSV
+        if args.to_csv and has_records:
+            extractor.export_to_csv(
+                date=args.date,
+                country=args.country,
+                product=args.product,
+                filename=args.output
+            )
     else:
         print("Failed to extract data")
 
 
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Запуск приложения с заданными аргументами
+
+    Повторные вызовы из Python (from data_extractor import run)
+    используют общий парсер, не создавая его заново.
+
+    Returns:
+        Код завершения (в том числе для --help и ошибок разбора аргументов)
+    """
+    try:
+        args = create_parser().parse_args(argv)
+    except SystemExit as e:
+        return e.code
+
+    # Валидация аргументов
+    is_valid, error_msg = validate_args(args)
+    if not is_valid:
+        print(error_msg)
+        return 1
+
+    config.ensure_dirs()
+
+    # Создание экстрактора
+    extractor = TradeDataExtractor(args.database, args.data_dir)
+
+    try:
+        # Однократная миграция: индексы записываются в файл БД
+        if args.create_indexes:
+            if not extractor.create_indexes():
+                return 1
+            print(f"Indexes created in {args.database}")
+            return 0
+
+        # Обработка операций со списками
+        if not handle_list_operations(args, extractor):
+            run_extraction(args, extractor)
+    finally:
+        extractor.close()
+
+    return 0
+
+
+def main():
+    """Основная функция приложения"""
+    sys.exit(run())
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
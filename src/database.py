@@ -1,36 +1,123 @@
 import sqlite3
-import pandas as pd
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict, Set, Iterator, TYPE_CHECKING
 from contextlib import contextmanager
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class DatabaseManager:
     """Менеджер базы данных"""
 
+    __slots__ = ('db_path', '_conn', '_lookups', '_pending_lookups')
+
+    # Настройки подключения (действуют только в пределах подключения)
+    PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA temp_store=MEMORY",
+    )
+
+    # Индексы создаются однократной миграцией (--create-indexes), а не при
+    # подключении: запросы не должны менять файл БД.
+    # Составной индекс покрывает и фильтр только по дате
+    INDEXES = (
+        "CREATE INDEX IF NOT EXISTS idx_hightech_rc ON hightech_2024(ReporterCode)",
+        "CREATE INDEX IF NOT EXISTS idx_hightech_cmd ON hightech_2024(cmdCode)",
+        "CREATE INDEX IF NOT EXISTS idx_hightech_drc "
+        "ON hightech_2024(date, ReporterCode, cmdCode)",
+    )
+
+    # Размер кэша подготовленных выражений sqlite3: текст запроса
+    # детерминирован для набора фильтров, повторные запросы не компилируются
+    CACHED_STATEMENTS = 256
+
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lookups: Dict[str, Dict[int, str]] = {}
+        self._pending_lookups: Set[str] = set()
+
+    def register_lookup(self, table: str, mapping: Dict[int, str]):
+        """Регистрация справочника (код: название) как временной таблицы"""
+        if self._lookups.get(table) is not mapping:
+            self._lookups[table] = mapping
+            self._pending_lookups.add(table)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открытие подключения с настройкой PRAGMA"""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.CACHED_STATEMENTS
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def create_indexes(self) -> bool:
+        """Создание индексов в файле БД (однократная миграция)"""
+        with self.get_connection() as conn:
+            if not conn:
+                return False
+
+            try:
+                for statement in self.INDEXES:
+                    conn.execute(statement)
+                conn.commit()
+                return True
+            except sqlite3.Error as e:
+                print(f"Could not create database indexes: {e}")
+                return False
+
+    def _create_lookup_tables(self, conn: sqlite3.Connection):
+        """Создание временных таблиц для новых справочников"""
+        for table in sorted(self._pending_lookups):
+            conn.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {table} "
+                f"(code INTEGER PRIMARY KEY, name TEXT)"
+            )
+            conn.execute(f"DELETE FROM temp.{table}")
+            conn.executemany(
+                f"INSERT INTO temp.{table} (code, name) VALUES (?, ?)",
+                self._lookups[table].items()
+            )
+        conn.commit()
+        self._pending_lookups.clear()
+
+    def close(self):
+        """Закрытие подключения (повторный запрос откроет новое)"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            # Временные таблицы жили в закрытом подключении
+            self._pending_lookups = set(self._lookups)
 
     @contextmanager
     def get_connection(self):
-        """Контекстный менеджер для подключения к БД"""
-        conn = None
+        """Контекстный менеджер для подключения к БД (одно на менеджер)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            yield conn
+            if self._conn is None:
+                self._conn = self._connect()
+            self._create_lookup_tables(self._conn)
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
             yield None
-        finally:
-            if conn:
-                conn.close()
+            return
+
+        yield self._conn
 
     def execute_query(
             self,
             query: str,
             params: List[Any] = None,
             fetch: bool = True
-    ) -> Optional[pd.DataFrame]:
+    ) -> Optional['pd.DataFrame']:
         """Выполнение SQL запроса"""
+        # pandas импортируется только при запросах, не для --list-*/--search-*
+        import pandas as pd
+
         with self.get_connection() as conn:
             if not conn:
                 return None
@@ -46,4 +133,32 @@ class DatabaseManager:
                     return None
             except Exception as e:
                 print(f"Query execution error: {e}")
-                return None
\ No newline at end of file
+                return None
+
+    def execute_query_iter(
+            self,
+            query: str,
+            params: List[Any] = None,
+            chunksize: int = 50_000,
+            dtype: Optional[Dict[str, str]] = None
+    ) -> Iterator['pd.DataFrame']:
+        """Выполнение SQL запроса с выдачей результата частями (dtype - типы столбцов)"""
+        import pandas as pd
+
+        with self.get_connection() as conn:
+            if not conn:
+                return
+
+            started = False
+            try:
+                for chunk in pd.read_sql_query(
+                        query, conn, params=params, chunksize=chunksize, dtype=dtype
+                ):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                print(f"Query execution error: {e}")
+                # Часть результата уже выдана: молча завершиться значило бы
+                # выдать усеченную выборку за полную
+                if started:
+                    raise
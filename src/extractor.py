@@ -1,12 +1,70 @@
-import pandas as pd
-from typing import Optional, Dict, Any
+from functools import cached_property
+from itertools import chain
+from typing import Optional, Dict, Any, List, Tuple, TYPE_CHECKING
 from pathlib import Path
 
 from .database import DatabaseManager
-from .utils.fuzzy_search import FuzzySearch
+from .utils.fuzzy_search import FuzzySearch, SearchIndex
 from .utils.file_handlers import FileHandler
 from config import config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Названия подставляются в SQL через временные таблицы справочников
+SELECT_QUERY = """
+SELECT t.date, t.flowtype, t.ReporterCode, t.PartnerName, t.cmdCode,
+       t.qty, t.primaryvalue AS primaryvalue,
+       COALESCE(c.name, CAST(t.ReporterCode AS TEXT)) AS reporter_name,
+       COALESCE(h.name, CAST(t.cmdCode AS TEXT)) AS product_description,
+       COALESCE(p.name, t.PartnerName) AS partner_name
+FROM hightech_2024 t
+LEFT JOIN temp.countries c ON c.code = t.ReporterCode
+LEFT JOIN temp.hs_codes h ON h.code = t.cmdCode
+LEFT JOIN temp.countries p ON p.code = t.PartnerName
+WHERE 1=1
+"""
+
+# Типы числовых столбцов SELECT_QUERY: без них тип выводится по каждой
+# части отдельно, и часть, начинающаяся с NULL, меняет формат CSV
+SELECT_DTYPES = {
+    'ReporterCode': 'Int64',
+    'cmdCode': 'Int64',
+    'qty': 'float64',
+    'primaryvalue': 'float64'
+}
+
+# Сводная статистика по всей выборке (без загрузки строк)
+SUMMARY_QUERY = """
+SELECT COUNT(*), COUNT(DISTINCT t.ReporterCode), COUNT(DISTINCT t.PartnerName),
+       SUM(t.primaryvalue), SUM(t.qty)
+FROM hightech_2024 t
+WHERE 1=1
+"""
+
+FLOW_COUNTS_QUERY = """
+SELECT t.flowtype, COUNT(*) AS records
+FROM hightech_2024 t
+WHERE 1=1 {conditions}
+GROUP BY t.flowtype
+ORDER BY records DESC
+"""
+
+# Описания столбцов
+COLUMN_DESCRIPTIONS = {
+    'date': 'Transaction Date',
+    'flowtype': 'Trade Flow Type (Import/Export)',
+    'ReporterCode': 'Reporter Country Code',
+    'reporter_name': 'Reporter Country Name',
+    'PartnerName': 'Partner Country Code',
+    'partner_name': 'Partner Country Name',
+    'cmdCode': 'HS Product Code',
+    'product_description': 'HS Product Description',
+    'qty': 'Quantity',
+    'primaryvalue': 'Trade Value (USD)'
+}
+
 
 class TradeDataExtractor:
     """Класс для извлечения торговых данных"""
@@ -16,11 +74,48 @@ class TradeDataExtractor:
         self.data_dir = Path(data_dir or config.DATA_DIR)
 
         self.db_manager = DatabaseManager(self.db_path)
-        self.country_codes = self._load_country_codes()
-        self.hs_codes = self._load_hs_codes()
+        # Построенные условия по фильтрам: коды разрешаются один раз
+        self._filters: Dict[Tuple, Optional[Tuple[str, List[Any]]]] = {}
+        # Разрешенные текстовые запросы: (запрос в нижнем регистре, тип) -> код
+        self._code_cache: Dict[Tuple[str, str], Optional[int]] = {}
+
+    def close(self):
+        """Освобождение подключения к БД"""
+        self.db_manager.close()
+
+    def create_indexes(self) -> bool:
+        """Создание индексов для фильтров в файле БД"""
+        return self.db_manager.create_indexes()
+
+    # Справочники загружаются лениво: --list-* и числовые коды
+    # не разбирают неиспользуемый файл
+    @cached_property
+    def country_codes(self) -> Dict[int, str]:
+        """Коды стран (с кодами по умолчанию при ошибке загрузки)"""
+        country_codes = self._load_country_codes()
+        if not country_codes:
+            print("Warning: Could not load country codes. Using default codes.")
+            country_codes = {792: 'Turkey', 643: 'Russian Federation'}
+        return country_codes
+
+    @cached_property
+    def hs_codes(self) -> Dict[int, str]:
+        """HS коды (с кодами по умолчанию при ошибке загрузки)"""
+        hs_codes = self._load_hs_codes()
+        if not hs_codes:
+            print("Warning: Could not load HS codes. Using default codes.")
+            hs_codes = {8401: 'Nuclear reactors'}
+        return hs_codes
+
+    @cached_property
+    def country_index(self) -> SearchIndex:
+        """Индекс нечеткого поиска по странам"""
+        return SearchIndex(self.country_codes)
 
-        # Загрузка кодов по умолчанию при необходимости
-        self._load_default_codes()
+    @cached_property
+    def hs_index(self) -> SearchIndex:
+        """Индекс нечеткого поиска по HS кодам"""
+        return SearchIndex(self.hs_codes)
 
     def _load_country_codes(self) -> Dict[int, str]:
         """Загрузка кодов стран"""
@@ -32,29 +127,42 @@ class TradeDataExtractor:
         json_path = self.data_dir / 'H5.json'
         return FileHandler.load_hs_codes(json_path)
 
-    def _load_default_codes(self):
-        """Загрузка кодов по умолчанию"""
-        if not self.country_codes:
-            print("Warning: Could not load country codes. Using default codes.")
-            self.country_codes = {792: 'Turkey', 643: 'Russian Federation'}
-
-        if not self.hs_codes:
-            print("Warning: Could not load HS codes. Using default codes.")
-            self.hs_codes = {8401: 'Nuclear reactors'}
+    def _reference(self, item_type: str) -> Tuple[Dict[int, str], SearchIndex]:
+        """Справочник и индекс поиска для типа элемента"""
+        if item_type == 'country':
+            return self.country_codes, self.country_index
+        return self.hs_codes, self.hs_index
 
     def _get_code(
             self,
             search_term: str,
-            mapping: Dict[int, str],
             item_type: str
     ) -> Optional[int]:
-        """Получение кода по текстовому запросу"""
+        """Получение кода по текстовому запросу (с кэшированием результата)"""
         if search_term.isdigit():
-            return int(search_term)
+            code = int(search_term)
+            mapping, _ = self._reference(item_type)
+            if code not in mapping:
+                print(f"Warning: {item_type.capitalize()} code {code} not found "
+                      f"in reference data, its name will not be resolved")
+            return code
+
+        key = (search_term.lower(), item_type)
+        if key not in self._code_cache:
+            self._code_cache[key] = self._resolve_code(search_term, item_type)
+        return self._code_cache[key]
+
+    def _resolve_code(
+            self,
+            search_term: str,
+            item_type: str
+    ) -> Optional[int]:
+        """Поиск кода по названию: точное совпадение или нечеткий поиск"""
+        mapping, index = self._reference(item_type)
 
         # Поиск лучшего соответствия
         code, name, matches = FuzzySearch.find_best_match(
-            search_term, mapping, item_type
+            search_term, mapping, item_type, index=index
         )
 
         if code is not None:
@@ -75,104 +183,187 @@ class TradeDataExtractor:
         print(f"Use --list-{item_type}s to see all available {item_type}s")
         return None
 
-    def extract_data(
+    def _build_filters(
             self,
             date: str = None,
             country: str = None,
             product: str = None
-    ) -> Optional[pd.DataFrame]:
-        """Извлечение данных по заданным критериям"""
-        query = """
-        SELECT date, flowtype, ReporterCode, PartnerName, cmdCode, qty, primaryvalue
-        FROM hightech_2024
-        WHERE 1=1
-        """
+    ) -> Optional[Tuple[str, List[Any]]]:
+        """Построение условий WHERE по фильтрам (None, если фильтр не разрешен)"""
+        key = (date, country, product)
+        if key in self._filters:
+            return self._filters[key]
 
+        conditions = ""
         params = []
-        conditions_added = False
+        result = None
 
         # Построение условий запроса
         if date:
-            query += " AND date = ?"
+            conditions += " AND t.date = ?"
             params.append(date)
-            conditions_added = True
 
         if country:
-            country_code = self._get_code(country, self.country_codes, 'country')
+            country_code = self._get_code(country, 'country')
             if country_code is None:
-                return pd.DataFrame()
-            query += " AND ReporterCode = ?"
+                self._filters[key] = None
+                return None
+            conditions += " AND t.ReporterCode = ?"
             params.append(country_code)
-            conditions_added = True
 
         if product:
-            product_code = self._get_code(product, self.hs_codes, 'product')
+            product_code = self._get_code(product, 'product')
             if product_code is None:
-                return pd.DataFrame()
-            query += " AND cmdCode = ?"
+                self._filters[key] = None
+                return None
+            conditions += " AND t.cmdCode = ?"
             params.append(product_code)
-            conditions_added = True
 
-        if not conditions_added:
+        if not params:
             print("Error: At least one filter must be specified (date, country, or product)")
             print("Use --date, --country, or --product option")
+        else:
+            result = (conditions, params)
+
+        self._filters[key] = result
+        return result
+
+    def _register_lookups(self):
+        """Регистрация справочников для SQL соединений"""
+        self.db_manager.register_lookup('countries', self.country_codes)
+        self.db_manager.register_lookup('hs_codes', self.hs_codes)
+
+    def extract_data(
+            self,
+            date: str = None,
+            country: str = None,
+            product: str = None,
+            limit: int = None
+    ) -> Optional['pd.DataFrame']:
+        """Извлечение данных по заданным критериям (limit - только первые записи)"""
+        import pandas as pd
+
+        filters = self._build_filters(date, country, product)
+        if filters is None:
             return pd.DataFrame()
 
+        conditions, params = filters
+        query = SELECT_QUERY + conditions
+        if limit is not None:
+            query += " LIMIT ?"
+            params = params + [limit]
+
         # Выполнение запроса
+        self._register_lookups()
         df = self.db_manager.execute_query(query, params)
 
         if df is not None and not df.empty:
-            # Преобразование типов и добавление названий
+            # Преобразование типов
             df = self._enrich_dataframe(df)
 
         return df
 
-    def _enrich_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Обогащение DataFrame дополнительной информацией"""
-        # Преобразование типов
-        df['ReporterCode'] = pd.to_numeric(df['ReporterCode'], errors='coerce')
-        df['cmdCode'] = pd.to_numeric(df['cmdCode'], errors='coerce')
+    def get_summary(
+            self,
+            date: str = None,
+            country: str = None,
+            product: str = None
+    ) -> Optional[Dict[str, Any]]:
+        """Сводная статистика по всей выборке, посчитанная в SQL"""
+        import pandas as pd
+
+        filters = self._build_filters(date, country, product)
+        if filters is None:
+            return None
+
+        conditions, params = filters
+        totals = self.db_manager.execute_query(SUMMARY_QUERY + conditions, params)
+        flows = self.db_manager.execute_query(
+            FLOW_COUNTS_QUERY.format(conditions=conditions), params
+        )
+        if totals is None or flows is None:
+            return None
+
+        records, reporters, partners, value, qty = totals.iloc[0].tolist()
+        return {
+            'records': int(records),
+            'flows': dict(zip(flows['flowtype'], flows['records'])),
+            'reporters': int(reporters),
+            'partners': int(partners),
+            'value': None if pd.isna(value) else value,
+            'qty': None if pd.isna(qty) else qty
+        }
 
-        # Добавление названий
-        df['reporter_name'] = df['ReporterCode'].map(self.country_codes)
-        df['product_description'] = df['cmdCode'].map(self.hs_codes)
-        df['partner_name'] = df['PartnerName'].map(self.country_codes)
+    def _enrich_dataframe(self, df: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Обогащение DataFrame дополнительной информацией"""
+        import pandas as pd
 
-        # Заполнение отсутствующих значений
-        df['reporter_name'] = df['reporter_name'].fillna(df['ReporterCode'].astype(str))
-        df['product_description'] = df['product_description'].fillna(df['cmdCode'].astype(str))
-        df['partner_name'] = df['partner_name'].fillna(df['PartnerName'])
+        # Преобразование типов: SQLite обычно уже отдает целые числа,
+        # тогда копия столбца не создается
+        for col in ('ReporterCode', 'cmdCode'):
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
 
+        # Названия уже подставлены в SQL (см. SELECT_QUERY)
         return df
 
-    def save_to_csv(self, df: pd.DataFrame, filename: str = None) -> bool:
+    @staticmethod
+    def _default_csv_filename() -> str:
+        """Имя CSV файла по умолчанию"""
+        from datetime import datetime
+        return f"{config.OUTPUT_DIR}/trade_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+    def save_to_csv(self, df: 'pd.DataFrame', filename: str = None) -> bool:
         """Сохранение данных в CSV"""
         if df is None or df.empty:
             print("No data to save")
             return False
 
-        # Генерация имени файла
-        from datetime import datetime
-        filename = filename or f"{config.OUTPUT_DIR}/trade_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-
-        # Описания столбцов
-        column_descriptions = {
-            'date': 'Transaction Date',
-            'flowtype': 'Trade Flow Type (Import/Export)',
-            'ReporterCode': 'Reporter Country Code',
-            'reporter_name': 'Reporter Country Name',
-            'PartnerName': 'Partner Country Code',
-            'partner_name': 'Partner Country Name',
-            'cmdCode': 'HS Product Code',
-            'product_description': 'HS Product Description',
-            'qty': 'Quantity',
-            'primaryvalue': 'Trade Value (USD)'
-        }
-
-        success = FileHandler.save_dataframe(df, filename, column_descriptions)
+        filename = filename or self._default_csv_filename()
+        success = FileHandler.save_dataframe(df, filename, COLUMN_DESCRIPTIONS)
 
         if success:
             print(f"Data saved to: {filename}")
             print(f"Records count: {len(df)}")
 
-        return success
\ No newline at end of file
+        return success
+
+    def export_to_csv(
+            self,
+            date: str = None,
+            country: str = None,
+            product: str = None,
+            filename: str = None,
+            chunksize: int = 50_000
+    ) -> bool:
+        """Потоковая выгрузка данных в CSV частями, без загрузки всей выборки"""
+        filters = self._build_filters(date, country, product)
+        if filters is None:
+            print("No data to save")
+            return False
+
+        conditions, params = filters
+        query = SELECT_QUERY + conditions
+        self._register_lookups()
+        chunks = self.db_manager.execute_query_iter(
+            query, params, chunksize=chunksize, dtype=SELECT_DTYPES
+        )
+
+        first = next(chunks, None)
+        if first is None or first.empty:
+            print("No data to save")
+            return False
+
+        filename = filename or self._default_csv_filename()
+        records = FileHandler.save_chunks(
+            (self._enrich_dataframe(chunk) for chunk in chain([first], chunks)),
+            filename,
+            COLUMN_DESCRIPTIONS
+        )
+
+        if records is None:
+            return False
+
+        print(f"Data saved to: {filename}")
+        print(f"Records count: {records}")
+        return True
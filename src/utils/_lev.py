@@ -0,0 +1,72 @@
+"""
+Ядро нечеткого поиска на Numba для окружений без rapidfuzz.
+
+Считает ту же метрику, что rapidfuzz.fuzz.ratio (Indel):
+схожесть = 2 * LCS / (len(a) + len(b)).
+"""
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # pragma: no cover - numba опционален
+    np = njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def bounded_lcs(a, b, min_lcs):
+        """
+        Длина наибольшей общей подпоследовательности двумя строками ДП
+
+        Возвращает -1, как только min_lcs становится недостижимым
+        """
+        la, lb = len(a), len(b)
+        prev = np.zeros(lb + 1, np.int32)
+        cur = np.zeros(lb + 1, np.int32)
+
+        for i in range(la):
+            for j in range(lb):
+                if a[i] == b[j]:
+                    cur[j + 1] = prev[j] + 1
+                else:
+                    cur[j + 1] = max(prev[j + 1], cur[j])
+
+            # Строка ДП не убывает: максимум в последней ячейке,
+            # оставшиеся символы a добавят не больше la - i - 1
+            if cur[lb] + (la - i - 1) < min_lcs:
+                return -1
+            prev, cur = cur, prev
+
+        return prev[lb]
+
+    @njit(cache=True)
+    def lcs_lengths(term, flat, offsets, threshold):
+        """Длины LCS запроса со всеми названиями (-1 - заведомо ниже порога)"""
+        n = len(offsets) - 1
+        result = np.full(n, -1, np.int32)
+        term_len = len(term)
+
+        for k in range(n):
+            name = flat[offsets[k]:offsets[k + 1]]
+            total = term_len + len(name)
+            if total == 0:
+                continue
+            # Консервативная (округленная вниз) граница для раннего выхода
+            min_lcs = int(threshold * total / 2)
+            if min(term_len, len(name)) < min_lcs:
+                continue
+            result[k] = bounded_lcs(term, name, min_lcs)
+
+        return result
+
+
+def to_codepoints(text: str):
+    """Строка -> массив кодов символов uint32"""
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+
+def pack(names):
+    """Названия -> (общий массив кодов символов, смещения начала каждого названия)"""
+    lengths = np.fromiter((len(name) for name in names), dtype=np.int64, count=len(names))
+    offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return to_codepoints(''.join(names)), offsets
@@ -1,9 +1,28 @@
-import pandas as pd
+import csv
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson опционален
+    orjson = None
+
+
+def _arrow_csv():
+    """Модули pyarrow и pyarrow.csv или (None, None), если pyarrow не установлен"""
+    # Импорт отложен: pyarrow нужен только при записи CSV
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return None, None
+    return pa, pacsv
+
 
 class FileHandler:
     """Класс для работы с файлами"""
@@ -15,12 +34,15 @@ class FileHandler:
 
         if csv_path.exists():
             try:
-                df = pd.read_csv(csv_path, encoding='utf-8')
-                for _, row in df.iterrows():
-                    if pd.notna(row['m49_code']) and pd.notna(row['country_name_en']):
+                # Модуль csv вместо pandas: список стран не требует импорта pandas
+                with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+                    for row in csv.DictReader(f):
+                        code, name = row.get('m49_code'), row.get('country_name_en')
+                        if not code or not name:
+                            continue
                         try:
-                            country_codes[int(row['m49_code'])] = row['country_name_en']
-                        except (ValueError, TypeError):
+                            country_codes[int(float(code))] = name
+                        except (ValueError, OverflowError):
                             continue
                 print(f"Loaded {len(country_codes)} country codes from CSV")
             except Exception as e:
@@ -37,16 +59,17 @@ class FileHandler:
 
         if json_path.exists():
             try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(json_path, 'rb') as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if orjson else json.loads(raw)
 
-                for item in data.get('results', []):
-                    item_id, text = item.get('id', ''), item.get('text', '')
-                    if item_id and text and item_id != 'TOTAL':
-                        try:
-                            hs_codes[int(item_id.replace('.', ''))] = text
-                        except (ValueError, TypeError):
-                            continue
+                # Числовые коды без точек; 'TOTAL' и пустые записи отсеиваются
+                hs_codes = {
+                    int(item['id'].replace('.', '')): item['text']
+                    for item in data.get('results', ())
+                    if item.get('text')
+                    and str(item.get('id', '')).replace('.', '').isdecimal()
+                }
                 print(f"Loaded {len(hs_codes)} HS codes from JSON")
             except Exception as e:
                 print(f"Error loading HS codes from JSON: {e}")
@@ -57,26 +80,122 @@ class FileHandler:
 
     @staticmethod
     def save_dataframe(
-            df: pd.DataFrame,
+            df: 'pd.DataFrame',
             filename: str,
             column_descriptions: Dict[str, str]
     ) -> bool:
         """Сохранение DataFrame в CSV с описаниями"""
         try:
-            # Сохранение данных
-            df.to_csv(filename, index=False, encoding='utf-8')
+            # Сохранение данных (pyarrow пишет строки в C++ быстрее pandas)
+            pa, pacsv = _arrow_csv()
+            if pacsv is not None:
+                pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), filename)
+            else:
+                df.to_csv(filename, index=False, encoding='utf-8')
 
             # Сохранение описаний
-            desc_filename = filename.replace('.csv', '_columns.txt')
-            with open(desc_filename, 'w', encoding='utf-8') as f:
-                f.write("COLUMN DESCRIPTIONS\n===================\n\n")
-                for col in df.columns:
-                    desc = column_descriptions.get(col, '[No description available]')
-                    f.write(f"{col}: {desc}\n")
-                f.write(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total records: {len(df)}\n")
+            FileHandler._save_descriptions(
+                filename, list(df.columns), column_descriptions, len(df)
+            )
 
             return True
         except Exception as e:
             print(f"File save error: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    @staticmethod
+    def save_chunks(
+            chunks: Iterable['pd.DataFrame'],
+            filename: str,
+            column_descriptions: Dict[str, str]
+    ) -> Optional[int]:
+        """
+        Потоковое сохранение частей DataFrame в один CSV с описаниями
+
+        Returns:
+            Количество записанных строк или None при ошибке
+        """
+        try:
+            pa, pacsv = _arrow_csv()
+            if pacsv is not None:
+                columns, total = FileHandler._write_chunks_arrow(
+                    chunks, filename, pa, pacsv
+                )
+            else:
+                columns, total = FileHandler._write_chunks_pandas(chunks, filename)
+
+            FileHandler._save_descriptions(
+                filename, columns, column_descriptions, total
+            )
+
+            return total
+        except Exception as e:
+            print(f"File save error: {e}")
+            # Недописанный CSV не оставляется
+            Path(filename).unlink(missing_ok=True)
+            return None
+
+    @staticmethod
+    def _write_chunks_pandas(
+            chunks: Iterable['pd.DataFrame'],
+            filename: str
+    ) -> Tuple[List[str], int]:
+        """Запись частей в CSV средствами pandas"""
+        columns, total = [], 0
+        with open(filename, 'w', encoding='utf-8', newline='') as f:
+            for chunk in chunks:
+                # Заголовок пишется только для первой части
+                chunk.to_csv(f, index=False, header=not columns)
+                columns = columns or list(chunk.columns)
+                total += len(chunk)
+        return columns, total
+
+    @staticmethod
+    def _write_chunks_arrow(
+            chunks: Iterable['pd.DataFrame'],
+            filename: str,
+            pa,
+            pacsv
+    ) -> Tuple[List[str], int]:
+        """Запись частей в CSV через инкрементальный pyarrow.csv.CSVWriter"""
+        columns, total = [], 0
+        schema = writer = None
+        try:
+            for chunk in chunks:
+                if writer is None:
+                    # Схема по первой части; полностью пустые в ней столбцы
+                    # пишутся как строки, чтобы принять значения из следующих частей
+                    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    schema = pa.schema([
+                        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                        for field in schema
+                    ])
+                    writer = pacsv.CSVWriter(filename, schema)
+                    columns = list(chunk.columns)
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if not table.schema.equals(schema):
+                    table = table.cast(schema)
+                writer.write_table(table)
+                total += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return columns, total
+
+    @staticmethod
+    def _save_descriptions(
+            filename: str,
+            columns: List[str],
+            column_descriptions: Dict[str, str],
+            total: int
+    ):
+        """Сохранение описаний столбцов рядом с CSV"""
+        desc_filename = filename.replace('.csv', '_columns.txt')
+        with open(desc_filename, 'w', encoding='utf-8') as f:
+            f.write("COLUMN DESCRIPTIONS\n===================\n\n")
+            for col in columns:
+                desc = column_descriptions.get(col, '[No description available]')
+                f.write(f"{col}: {desc}\n")
+            f.write(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Total records: {total}\n")
@@ -1,6 +1,46 @@
-
 import difflib
-from typing import Dict, List, Tuple, Any
+import os
+from functools import cached_property
+from typing import Dict, List, Tuple, Any, Optional
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # pragma: no cover - rapidfuzz опционален
+    fuzz = process = None
+
+# Начиная с этого числа названий rapidfuzz считает схожесть во всех потоках.
+# Для одного запроса cdist параллелит только строки матрицы, поэтому названия
+# ставятся строками - это дороже на элемент (~1.5x в одном потоке) и окупается
+# лишь на справочниках заметно больше HS (~6.7 тыс. названий)
+PARALLEL_THRESHOLD = 20_000
+
+# Объем работы (названий x запросов к одному индексу), с которого без rapidfuzz
+# включается ядро Numba. Импорт numba и компиляция стоят ~0.5-1.6 с против
+# ~0.01 с на запрос difflib по HS, поэтому разовый поиск из CLI идет через difflib
+NUMBA_MIN_WORK = 500_000
+
+
+class SearchIndex:
+    """Предвычисленные массивы кодов и названий для нечеткого поиска"""
+
+    def __init__(self, mapping: Dict[int, str]):
+        self.codes = tuple(mapping.keys())
+        self.names = tuple(mapping.values())
+        self.names_lower = tuple(str(name).lower() for name in self.names)
+
+        # Точное совпадение за O(1): название в нижнем регистре -> первый код
+        self.by_name: Dict[str, int] = {}
+        for code, name_lower in zip(self.codes, self.names_lower):
+            self.by_name.setdefault(name_lower, code)
+
+        # Число оценок по индексу - окупается ли компиляция ядра Numba
+        self.queries = 0
+
+    @cached_property
+    def codepoints(self):
+        """Названия одним массивом кодов символов со смещениями (для ядра Numba)"""
+        from . import _lev
+        return _lev.pack(self.names_lower)
 
 
 class FuzzySearch:
@@ -12,7 +52,8 @@ class FuzzySearch:
             mapping: Dict[int, str],
             threshold: float = 0.6,
             partial_match_score: float = 0.9,
-            max_results: int = 5
+            max_results: int = 5,
+            index: Optional[SearchIndex] = None
     ) -> List[Tuple[int, str, float]]:
         """
         Нечеткий поиск в словаре
@@ -23,30 +64,115 @@ class FuzzySearch:
             threshold: Порог схожести
             partial_match_score: Оценка для частичного совпадения
             max_results: Максимальное количество результатов
+            index: Предвычисленный индекс по mapping (строится, если не задан)
 
         Returns:
             Список кортежей (код, название, схожесть)
         """
         search_term = search_term.lower()
-        matches = []
+        index = index or SearchIndex(mapping)
+        names_lower = index.names_lower
 
-        for code, name in mapping.items():
-            name_lower = str(name).lower()
-            similarity = difflib.SequenceMatcher(None, search_term, name_lower).ratio()
+        scores = FuzzySearch._score(search_term, index, threshold)
 
-            if similarity >= threshold:
-                matches.append((code, name, similarity))
-            elif search_term in name_lower:
-                matches.append((code, name, partial_match_score))
+        # Частичное совпадение для названий ниже порога
+        for idx, name_lower in enumerate(names_lower):
+            if idx not in scores and search_term in name_lower:
+                scores[idx] = partial_match_score
 
+        matches = [(index.codes[idx], index.names[idx], similarity)
+                   for idx, similarity in sorted(scores.items())]
         return sorted(matches, key=lambda x: x[2], reverse=True)[:max_results]
 
+    @staticmethod
+    def _score(
+            search_term: str,
+            index: SearchIndex,
+            threshold: float
+    ) -> Dict[int, float]:
+        """Оценка схожести: индекс названия -> схожесть (не ниже порога)"""
+        names_lower = index.names_lower
+
+        if process is not None:
+            # fuzz.ratio - это Indel (через LCS), а SequenceMatcher.ratio -
+            # Ratcliff/Obershelp с autojunk: бэкенды могут по-разному оценивать
+            # и ранжировать названия, оценка rapidfuzz не ниже, чем у difflib.
+            # score_cutoff прерывает расчет, как только порог недостижим.
+            # Levenshtein строже к опечаткам ('turkey' -> 'türkiye' = 0.57)
+            cutoff = threshold * 100
+            if len(names_lower) >= PARALLEL_THRESHOLD and (os.cpu_count() or 1) > 1:
+                similarities = process.cdist(
+                    names_lower, [search_term], scorer=fuzz.ratio,
+                    score_cutoff=cutoff, dtype='float64', workers=-1
+                )[:, 0]
+            else:
+                similarities = process.cdist(
+                    [search_term], names_lower, scorer=fuzz.ratio,
+                    score_cutoff=cutoff, dtype='float64'
+                )[0]
+
+            # cdist обнуляет оценки ниже score_cutoff
+            positions = range(len(names_lower))
+            if cutoff > 0:
+                positions = (similarities > 0).nonzero()[0].tolist()
+            return {idx: float(similarities[idx]) / 100 for idx in positions}
+
+        # Без rapidfuzz - ядро на Numba, если установлен и серия запросов
+        # к индексу окупает его запуск (импорт только здесь)
+        index.queries += 1
+        if len(names_lower) * index.queries >= NUMBA_MIN_WORK:
+            from . import _lev
+            if _lev.njit is not None:
+                return FuzzySearch._score_numba(search_term, index, threshold, _lev)
+
+        matcher = difflib.SequenceMatcher(None)
+        matcher.set_seq1(search_term)
+        term_len = len(search_term)
+
+        scores = {}
+        for idx, name_lower in enumerate(names_lower):
+            # Верхняя оценка по длинам (real_quick_ratio) без построения индекса
+            total_len = term_len + len(name_lower)
+            if not total_len or 2 * min(term_len, len(name_lower)) / total_len < threshold:
+                continue
+
+            matcher.set_seq2(name_lower)
+            if matcher.quick_ratio() < threshold:
+                continue
+
+            similarity = matcher.ratio()
+            if similarity >= threshold:
+                scores[idx] = similarity
+        return scores
+
+    @staticmethod
+    def _score_numba(
+            search_term: str,
+            index: SearchIndex,
+            threshold: float,
+            kernel
+    ) -> Dict[int, float]:
+        """Оценка схожести (Indel, как fuzz.ratio) скомпилированным ядром"""
+        flat, offsets = index.codepoints
+        lcs = kernel.lcs_lengths(
+            kernel.to_codepoints(search_term), flat, offsets, threshold
+        )
+
+        scores = {}
+        term_len = len(search_term)
+        for idx in (lcs >= 0).nonzero()[0].tolist():
+            similarity = 2 * int(lcs[idx]) / (term_len + len(index.names_lower[idx]))
+            if similarity >= threshold:
+                scores[idx] = similarity
+        return scores
+
     @staticmethod
     def find_best_match(
             search_term: str,
             mapping: Dict[int, str],
             item_type: str,
-            exact_search: bool = True
+            exact_search: bool = True,
+            index: Optional[SearchIndex] = None
     ) -> Tuple[int, str, List[Tuple[int, str, float]]]:
         """
         Поиск лучшего соответствия с выводом подсказок
@@ -56,24 +182,27 @@ class FuzzySearch:
             mapping: Словарь для поиска
             item_type: Тип элемента ('country' или 'product')
             exact_search: Использовать точный поиск
+            index: Предвычисленный индекс по mapping (строится, если не задан)
 
         Returns:
             Кортеж (найденный код, название, все совпадения)
         """
         search_lower = search_term.lower()
+        index = index or SearchIndex(mapping)
         fuzzy_matches = []
 
         # Точный поиск
         if exact_search:
-            for code, name in mapping.items():
-                if str(name).lower() == search_lower:
-                    return code, name, []
+            code = index.by_name.get(search_lower)
+            if code is not None:
+                return code, mapping.get(code, search_term), []
 
         # Нечеткий поиск
         fuzzy_matches = FuzzySearch.search(
             search_lower,
             mapping,
-            threshold=0.6 if item_type == 'country' else 0.5
+            threshold=0.6 if item_type == 'country' else 0.5,
+            index=index
         )
 
-        return None, None, fuzzy_matches
\ No newline at end of file
+        return None, None, fuzzy_matches
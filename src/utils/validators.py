@@ -11,7 +11,8 @@ def validate_args(args: argparse.Namespace) -> Tuple[bool, str]:
 
     if not any([args.date, args.country, args.product,
                 args.list_countries, args.list_products,
-                args.search_country, args.search_product]):
+                args.search_country, args.search_product,
+                args.create_indexes]):
         return False, "Error: No arguments provided. Use --help for usage."
 
     return True, ""
@@ -0,0 +1,33 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+ROWS = [
+    # Первая часть выборки целиком из NULL в числовых столбцах
+    ('2024-01-01', 'Экспорт', None, '643', None, None, None),
+    ('2024-01-01', 'Импорт', None, '643', None, None, None),
+    ('2024-01-01', 'Экспорт', 36, '643', 8401, 504.0, 102687.179),
+    ('2024-01-01', 'Импорт', 792, '643', 8542, 12.5, 3000.0),
+    ('2024-01-01', 'Экспорт', 36, None, 8401, 1.0, 2.0),
+]
+
+
+@pytest.fixture
+def data_dir():
+    return str(DATA_DIR)
+
+
+@pytest.fixture
+def database(tmp_path):
+    db_path = tmp_path / 'trade.db'
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            'CREATE TABLE hightech_2024 (date TEXT, flowtype TEXT, ReporterCode INTEGER, '
+            'PartnerName TEXT, cmdCode INTEGER, qty REAL, primaryValue REAL)'
+        )
+        conn.executemany('INSERT INTO hightech_2024 VALUES (?, ?, ?, ?, ?, ?, ?)', ROWS)
+    conn.close()
+    return str(db_path)
@@ -0,0 +1,15 @@
+from data_extractor import run
+
+
+def test_limit_zero_still_summarises_and_exports(monkeypatch, tmp_path, capsys, database, data_dir):
+    monkeypatch.chdir(tmp_path)
+    output = tmp_path / 'out.csv'
+
+    code = run(['-db', database, '-data', data_dir, '-d', '2024-01-01',
+                '-l', '0', '-csv', '-o', str(output)])
+
+    assert code == 0
+    # Строки не выводятся, но статистика и CSV - по всей выборке
+    assert 'Total records: 5' in capsys.readouterr().out
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 1 + 5
+
@@ -0,0 +1,60 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.extractor import TradeDataExtractor
+from src.utils import file_handlers
+
+
+@pytest.mark.parametrize('arrow', [True, False], ids=['pyarrow', 'pandas'])
+def test_export_does_not_depend_on_chunksize(monkeypatch, tmp_path, database, data_dir, arrow):
+    if arrow and file_handlers._arrow_csv()[1] is None:
+        pytest.skip('pyarrow не установлен')
+    if not arrow:
+        monkeypatch.setattr(file_handlers, '_arrow_csv', lambda: (None, None))
+
+    extractor = TradeDataExtractor(database, data_dir)
+    outputs = []
+    try:
+        for chunksize in (2, 100):
+            filename = str(tmp_path / f'export_{chunksize}.csv')
+            assert extractor.export_to_csv(
+                date='2024-01-01', filename=filename, chunksize=chunksize
+            )
+            outputs.append(Path(filename).read_text(encoding='utf-8'))
+    finally:
+        extractor.close()
+
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize('arrow', [True, False], ids=['pyarrow', 'pandas'])
+def test_export_failure_after_first_chunk(monkeypatch, tmp_path, database, data_dir, arrow):
+    if arrow and file_handlers._arrow_csv()[1] is None:
+        pytest.skip('pyarrow не установлен')
+    if not arrow:
+        monkeypatch.setattr(file_handlers, '_arrow_csv', lambda: (None, None))
+
+    read_sql_query = pd.read_sql_query
+
+    def failing_read(*args, **kwargs):
+        chunks = read_sql_query(*args, **kwargs)
+        yield next(chunks)
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(pd, 'read_sql_query', failing_read)
+
+    extractor = TradeDataExtractor(database, data_dir)
+    filename = tmp_path / 'export.csv'
+    try:
+        saved = extractor.export_to_csv(
+            date='2024-01-01', filename=str(filename), chunksize=2
+        )
+    finally:
+        extractor.close()
+
+    # Усеченная выгрузка не выдается за успешную
+    assert not saved
+    assert not filename.exists()
@@ -0,0 +1,88 @@
+import difflib
+from pathlib import Path
+
+import pytest
+
+from src.utils import _lev, fuzzy_search
+from src.utils.file_handlers import FileHandler
+from src.utils.fuzzy_search import FuzzySearch, SearchIndex
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+QUERIES = ['turky', 'ab', 'a', 'germny', 'united states', 'kor', 'nuclear reactor', 'xyz']
+THRESHOLDS = [0.0, 0.3, 0.5, 0.6, 0.8]
+
+
+@pytest.fixture(scope='module')
+def countries():
+    return FileHandler.load_country_codes(DATA_DIR / 'countries_codes.csv')
+
+
+@pytest.fixture(scope='module')
+def hs_codes():
+    return FileHandler.load_hs_codes(DATA_DIR / 'H5.json')
+
+
+@pytest.fixture
+def difflib_only(monkeypatch):
+    """Отключает rapidfuzz и Numba, оставляя только difflib"""
+    monkeypatch.setattr(fuzzy_search, 'process', None)
+    monkeypatch.setattr(_lev, 'njit', None)
+
+
+def plain_scan(search_term, names_lower, threshold):
+    """Эталон: SequenceMatcher.ratio по всем названиям без отсечений"""
+    scores = {}
+    for idx, name_lower in enumerate(names_lower):
+        similarity = difflib.SequenceMatcher(None, search_term, name_lower).ratio()
+        if similarity >= threshold:
+            scores[idx] = similarity
+    return scores
+
+
+@pytest.mark.parametrize('threshold', THRESHOLDS)
+@pytest.mark.parametrize('query', QUERIES)
+def test_difflib_pruning_matches_plain_scan(difflib_only, countries, query, threshold):
+    index = SearchIndex(countries)
+
+    pruned = FuzzySearch._score(query, index, threshold)
+
+    assert pruned == plain_scan(query, index.names_lower, threshold)
+
+
+def test_single_query_stays_on_difflib(monkeypatch, countries):
+    monkeypatch.setattr(fuzzy_search, 'process', None)
+    index = SearchIndex(countries)
+
+    FuzzySearch.search('turky', countries, 0.5, index=index)
+
+    # Ядро Numba не запускалось: упакованные коды названий не строились
+    assert 'codepoints' not in vars(index)
+
+
+def test_numba_kernel_after_enough_queries(monkeypatch, countries):
+    if _lev.njit is None:
+        pytest.skip('numba не установлен')
+    monkeypatch.setattr(fuzzy_search, 'process', None)
+    monkeypatch.setattr(fuzzy_search, 'NUMBA_MIN_WORK', 2 * len(countries))
+    index = SearchIndex(countries)
+
+    FuzzySearch.search('turky', countries, 0.5, index=index)
+    assert 'codepoints' not in vars(index)
+
+    FuzzySearch.search('turky', countries, 0.5, index=index)
+    assert 'codepoints' in vars(index)
+
+
+@pytest.mark.parametrize('threshold', THRESHOLDS)
+@pytest.mark.parametrize('query', QUERIES)
+@pytest.mark.parametrize('reference', ['countries', 'hs_codes'])
+def test_numba_kernel_matches_rapidfuzz(request, reference, query, threshold):
+    if _lev.njit is None or fuzzy_search.process is None:
+        pytest.skip('нужны numba и rapidfuzz')
+    index = SearchIndex(request.getfixturevalue(reference))
+
+    expected = FuzzySearch._score(query, index, threshold)
+    scores = FuzzySearch._score_numba(query, index, threshold, _lev)
+
+    assert scores == pytest.approx(expected)